@@ -0,0 +1,44 @@
+from django.core.checks import Warning, register
+from django.urls import URLPattern, URLResolver
+from rest_framework.routers import APIRootView
+
+
+def _iter_patterns(patterns):
+    for pattern in patterns:
+        if isinstance(pattern, URLResolver):
+            yield from _iter_patterns(pattern.url_patterns)
+        elif isinstance(pattern, URLPattern):
+            yield pattern
+
+
+@register()
+def check_query_budgets(app_configs, **kwargs):
+    """Every endpoint in api/urls.py must declare a query budget for each method it serves"""
+    from api import urls
+    from api.query_budget import get_query_budget
+
+    errors = []
+    seen = set()
+    for pattern in _iter_patterns(urls.urlpatterns):
+        view = pattern.callback
+        cls = getattr(view, 'cls', None)
+        if cls is not None and issubclass(cls, APIRootView):
+            continue
+        actions = getattr(view, 'actions', None)
+        if actions:
+            methods = list(actions)
+        else:
+            methods = [method for method in getattr(cls, 'http_method_names', []) if method not in ('head', 'options', 'trace') and hasattr(cls, method)]
+        for method in methods:
+            key = (view, method)
+            if key in seen:
+                continue
+            seen.add(key)
+            if get_query_budget(view, method) is None:
+                name = f'{cls.__name__}.{actions[method]}' if actions else getattr(cls, '__name__', repr(view))
+                errors.append(Warning(
+                    f'{name} has no query budget for {method.upper()} ({pattern.pattern})',
+                    hint='Add it to the view\'s query_budgets, or use @query_budget on function views.',
+                    id='api.W001',
+                ))
+    return errors
@@ -0,0 +1,58 @@
+from django.contrib.auth.models import User
+from django.core.cache import cache
+
+from api.serializers.post_serializer import AuthorSerializer
+
+AUTHOR_CACHE_TIMEOUT = 30  # seconds; author info rarely changes and staleness is harmless
+
+
+class AuthorLoader:
+    """
+    Dataloader-style batching of author lookups.
+    Ids are queued with `load_many` and resolved together: first from the cache,
+    then with a single `id__in` query for whatever is missing.
+    """
+
+    def __init__(self):
+        self._resolved = {}
+
+    @staticmethod
+    def cache_key(user_id):
+        return f'author:{user_id}'
+
+    def load_many(self, ids):
+        """Return serialized authors for `ids`, in order, skipping unknown ids"""
+        missing = [user_id for user_id in ids if user_id not in self._resolved]
+        if missing:
+            self._fetch(missing)
+        return [self._resolved[user_id] for user_id in ids if self._resolved.get(user_id) is not None]
+
+    def _fetch(self, ids):
+        cached = cache.get_many([self.cache_key(user_id) for user_id in ids])
+        misses = []
+        for user_id in ids:
+            data = cached.get(self.cache_key(user_id))
+            if data is None:
+                misses.append(user_id)
+            else:
+                self._resolved[user_id] = data
+
+        if not misses:
+            return
+        fresh = {}
+        for user in User.objects.filter(id__in=misses).only('id', 'username', 'is_staff'):
+            data = AuthorSerializer(user).data
+            self._resolved[user.id] = data
+            fresh[self.cache_key(user.id)] = data
+        for user_id in misses:
+            # Remember unknown ids for the rest of the request, but don't cache them
+            self._resolved.setdefault(user_id, None)
+        cache.set_many(fresh, timeout=AUTHOR_CACHE_TIMEOUT)
+
+
+def get_author_loader(request):
+    """One loader per request, so repeated lookups within a request are free"""
+    loader = getattr(request, '_author_loader', None)
+    if loader is None:
+        loader = request._author_loader = AuthorLoader()
+    return loader
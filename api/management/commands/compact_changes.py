@@ -0,0 +1,42 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from api.models import ChangeLog, ChangeLogCompaction
+
+
+class Command(BaseCommand):
+    help = 'Delete change feed entries older than the retention window, oldest first, in bounded batches'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--keep-days', type=int, default=30,
+                            help='Keep entries from the last N days (default: 30)')
+        parser.add_argument('--batch-size', type=int, default=1000,
+                            help='Rows deleted per statement (default: 1000)')
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(days=options['keep_days'])
+        horizon = (
+            ChangeLog.objects.settled().filter(created_at__lt=cutoff)
+            .order_by('-txid', '-seq').values_list('txid', 'seq').first()
+        )
+        if horizon is None:
+            self.stdout.write('Nothing to compact')
+            return
+        # Record the horizon first so /api/changes/ refuses tokens from the dropped range
+        ChangeLogCompaction.objects.create(txid=horizon[0], seq=horizon[1])
+
+        # Only ever drop a prefix of the log
+        compacted = 0
+        while True:
+            seqs = list(
+                ChangeLog.objects.up_to(horizon)
+                .in_order().values_list('seq', flat=True)[:options['batch_size']]
+            )
+            if not seqs:
+                break
+            ChangeLog.objects.filter(seq__in=seqs).delete()
+            compacted += len(seqs)
+
+        self.stdout.write(f'Compacted {compacted} change log entries')
@@ -0,0 +1,63 @@
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from api.models import Attachment, Category, Post, Comment
+from api.uploads import delete_unreferenced_files
+
+
+class Command(BaseCommand):
+    help = 'Hard-delete soft-deleted posts, comments and categories in bounded batches'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500,
+                            help='Rows deleted per transaction (default: 500)')
+        parser.add_argument('--grace-minutes', type=int, default=0,
+                            help='Only purge rows tombstoned at least this long ago')
+        parser.add_argument('--sleep', type=float, default=0.0,
+                            help='Seconds to pause between batches to let other writers in')
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(minutes=options['grace_minutes'])
+        tombstoned = Q(deleted_at__lte=cutoff)
+
+        # Children first, so deleting a parent never has a large cascade to collect
+        targets = [
+            (Comment, tombstoned | Q(post__deleted_at__lte=cutoff) | Q(post__category__deleted_at__lte=cutoff)),
+            (Post, tombstoned | Q(category__deleted_at__lte=cutoff)),
+            (Category, tombstoned),
+        ]
+        # Stored files can be shared between attachments (deduplication), so they are
+        # only removed once no remaining attachment references them
+        stored_files = set()
+
+        def collect_files(post_pks):
+            for file_name, thumbnail in Attachment.objects.filter(post_id__in=post_pks).values_list('file', 'thumbnail'):
+                stored_files.update((file_name, thumbnail))
+
+        for model, condition in targets:
+            on_batch = collect_files if model is Post else None
+            purged = self.purge(model, condition, options['batch_size'], options['sleep'], on_batch)
+            self.stdout.write(f'Purged {purged} {model.__name__} rows')
+
+        removed = delete_unreferenced_files(stored_files, options['batch_size'])
+        self.stdout.write(f'Removed {removed} unreferenced files')
+
+    def purge(self, model, condition, batch_size, sleep, on_batch=None):
+        purged = 0
+        queryset = model.all_objects.filter(condition).order_by('pk')
+        while True:
+            pks = list(queryset.values_list('pk', flat=True)[:batch_size])
+            if not pks:
+                return purged
+            with transaction.atomic():
+                if on_batch:
+                    on_batch(pks)
+                model.all_objects.filter(pk__in=pks).delete()
+            purged += len(pks)
+            if sleep:
+                time.sleep(sleep)
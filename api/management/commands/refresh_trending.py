@@ -0,0 +1,39 @@
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.utils import timezone
+
+from api.models import Comment, TrendingPost
+from api.models.trending import WINDOW_HALF_LIVES, build_scores, trending_window
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the trending posts table from recent comments and drop posts that have gone cold'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--half-lives', type=int, default=WINDOW_HALF_LIVES,
+                            help=f'Only count comments from the last N half-lives (default: {WINDOW_HALF_LIVES})')
+
+    def handle(self, *args, **options):
+        window = trending_window(options['half_lives'])
+
+        with transaction.atomic():
+            # Block record_comment/discard_comment until the rebuild commits. A comment
+            # transaction that commits before the lock is counted by the read below;
+            # one that commits after applies its change on top of the rebuilt scores.
+            # (SQLite only ever has one writer, so it needs no explicit lock.)
+            if connection.vendor == 'postgresql':
+                with connection.cursor() as cursor:
+                    cursor.execute(f'LOCK TABLE {TrendingPost._meta.db_table} IN EXCLUSIVE MODE')
+
+            since = timezone.now() - window
+            # One streaming pass over recent comments; older activity has decayed away
+            comments = Comment.objects.filter(created_at__gte=since).values_list('post_id', 'created_at')
+            scores = build_scores(comments.iterator(chunk_size=2000))
+
+            TrendingPost.objects.all().delete()
+            TrendingPost.objects.bulk_create(
+                [TrendingPost(post_id=post_id, score=score) for post_id, score in scores.items()],
+                batch_size=1000,
+            )
+
+        self.stdout.write(f'Ranked {len(scores)} trending posts')
@@ -0,0 +1,39 @@
+from django.db import migrations
+from django.utils import timezone
+
+
+def backfill_trending(apps, schema_editor):
+    """
+    Score existing comments so that deleting one of them later subtracts from
+    a score that actually counted it. Historical models have no soft delete
+    manager, so the tombstone filters are spelled out here.
+    """
+    from api.models.trending import build_scores, trending_window
+
+    Comment = apps.get_model('api', 'Comment')
+    TrendingPost = apps.get_model('api', 'TrendingPost')
+
+    comments = Comment.objects.filter(
+        created_at__gte=timezone.now() - trending_window(),
+        deleted_at__isnull=True,
+        post__deleted_at__isnull=True,
+        post__category__deleted_at__isnull=True,
+    ).values_list('post_id', 'created_at')
+    scores = build_scores(comments.iterator(chunk_size=2000))
+
+    TrendingPost.objects.all().delete()
+    TrendingPost.objects.bulk_create(
+        [TrendingPost(post_id=post_id, score=score) for post_id, score in scores.items()],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0005_attachment'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_trending, migrations.RunPython.noop),
+    ]
@@ -1,5 +1,8 @@
 from .category import Category
 from .post import Post
 from .comment import Comment
+from .trending import TrendingPost
+from .change_log import ChangeLog, ChangeLogCompaction
+from .attachment import Attachment
 
-__all__ = ['Category', 'Post', 'Comment']
\ No newline at end of file
+__all__ = ['Category', 'Post', 'Comment', 'TrendingPost', 'ChangeLog', 'ChangeLogCompaction', 'Attachment']
\ No newline at end of file
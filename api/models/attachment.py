@@ -0,0 +1,17 @@
+from django.db import models
+from django.contrib.auth.models import User
+from .post import Post
+
+class Attachment(models.Model):
+    post = models.ForeignKey(Post, on_delete=models.CASCADE, related_name='attachments')
+    uploader = models.ForeignKey(User, on_delete=models.CASCADE)
+    # Identical uploads share one stored file, found through this hash
+    sha256 = models.CharField(max_length=64, db_index=True)
+    file = models.FileField(max_length=255)
+    thumbnail = models.FileField(max_length=255, blank=True)
+    content_type = models.CharField(max_length=100)
+    size = models.PositiveBigIntegerField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return self.file.name
@@ -1,12 +1,22 @@
 from django.db import models
+from .soft_delete import SoftDeleteModel
+from .change_log import ChangeLoggedModel
 
-class Category(models.Model):
+class Category(ChangeLoggedModel, SoftDeleteModel):
     name = models.CharField(max_length=200, blank=False, null=False)
     slug = models.SlugField(max_length=200, blank=False, null=False)
     description = models.TextField(blank=False, null=False)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            # Partial indexes: live-row lookups only scan live rows,
+            # and the purge command only scans tombstones
+            models.Index(fields=['slug'], condition=models.Q(deleted_at__isnull=True), name='category_live_slug_idx'),
+            models.Index(fields=['deleted_at'], condition=models.Q(deleted_at__isnull=False), name='category_tombstone_idx'),
+        ]
+
     def __str__(self):
         return self.name
-    
\ No newline at end of file
+    
@@ -0,0 +1,110 @@
+from django.db import connections, models, router, transaction
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+
+# Postgres transaction ids, as bigints so they compare without wraparound
+CURRENT_TXID_SQL = 'pg_current_xact_id()::text::bigint'
+SNAPSHOT_XMIN_SQL = 'pg_snapshot_xmin(pg_current_snapshot())::text::bigint'
+
+
+class ChangeLogQuerySet(models.QuerySet):
+    def settled(self):
+        """
+        Entries that can no longer be preceded by a newly committed one: every
+        transaction with a lower id than theirs has finished.
+        """
+        if connections[self.db].vendor != 'postgresql':
+            return self
+        return self.filter(txid__lt=RawSQL(SNAPSHOT_XMIN_SQL, []))
+
+    def after(self, position):
+        txid, seq = position
+        return self.filter(Q(txid__gt=txid) | Q(txid=txid, seq__gt=seq))
+
+    def up_to(self, position):
+        txid, seq = position
+        return self.filter(Q(txid__lt=txid) | Q(txid=txid, seq__lte=seq))
+
+    def in_order(self):
+        return self.order_by('txid', 'seq')
+
+
+class ChangeLog(models.Model):
+    """
+    Append-only feed of post, comment and category changes for delta sync.
+    Entries are ordered by `(txid, seq)`, their position, which is what
+    change tokens encode.
+    """
+    CREATED = 'created'
+    UPDATED = 'updated'
+    DELETED = 'deleted'
+    ACTION_CHOICES = [
+        (CREATED, 'Created'),
+        (UPDATED, 'Updated'),
+        (DELETED, 'Deleted'),
+    ]
+
+    seq = models.BigAutoField(primary_key=True)
+    # Id of the writing transaction on Postgres; 0 on SQLite, where commits are serialized
+    txid = models.BigIntegerField(default=0)
+    model = models.CharField(max_length=20)
+    object_id = models.BigIntegerField()
+    action = models.CharField(max_length=10, choices=ACTION_CHOICES)
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    objects = ChangeLogQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['txid', 'seq'], name='changelog_position_idx'),
+        ]
+
+    def __str__(self):
+        return f'#{self.seq} {self.action} {self.model}:{self.object_id}'
+
+
+class ChangeLogCompaction(models.Model):
+    """Position up to which `compact_changes` has dropped the log"""
+    txid = models.BigIntegerField()
+    seq = models.BigIntegerField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f'{self.txid}.{self.seq}'
+
+    @classmethod
+    def horizon(cls):
+        return cls.objects.order_by('-txid', '-seq').values_list('txid', 'seq').first() or (0, 0)
+
+
+class ChangeLoggedModel(models.Model):
+    """
+    Records every save in the ChangeLog within the same transaction.
+    Bulk `QuerySet.update()` calls bypass `save()` and are not logged.
+
+    Sequence numbers are handed out on insert, not on commit, so a transaction
+    could commit seq 102 while seq 101 is still pending, and a client that had
+    already moved past 102 would never see 101. Instead of serializing writers,
+    each entry records its transaction id and the feed only serves entries
+    below the oldest transaction still running (see `ChangeLogQuerySet.settled`).
+    SQLite allows only one writer at a time, so seq order is commit order there.
+    """
+
+    class Meta:
+        abstract = True
+
+    def save(self, *args, **kwargs):
+        created = self._state.adding
+        using = kwargs.get('using') or router.db_for_write(type(self), instance=self)
+        with transaction.atomic(using=using):
+            super().save(*args, **kwargs)
+            if getattr(self, 'deleted_at', None) is not None:
+                action = ChangeLog.DELETED
+            elif created:
+                action = ChangeLog.CREATED
+            else:
+                action = ChangeLog.UPDATED
+            ChangeLog.objects.using(using).create(
+                model=self._meta.model_name, object_id=self.pk, action=action,
+                txid=RawSQL(CURRENT_TXID_SQL, []) if connections[using].vendor == 'postgresql' else 0,
+            )
@@ -1,14 +1,25 @@
 from django.db import models
 from django.contrib.auth.models import User
 from .post import Post
+from .soft_delete import SoftDeleteModel
+from .change_log import ChangeLoggedModel
 
-class Comment(models.Model):
+class Comment(ChangeLoggedModel, SoftDeleteModel):
     post = models.ForeignKey(Post, on_delete=models.CASCADE)
     author = models.ForeignKey(User, on_delete=models.CASCADE)
     content = models.TextField(blank=False, null=False)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    # Comments of a soft-deleted post (or of a post in a soft-deleted category) are hidden until purged
+    soft_delete_parents = ('post', 'post__category')
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['post'], condition=models.Q(deleted_at__isnull=True), name='comment_live_post_idx'),
+            models.Index(fields=['deleted_at'], condition=models.Q(deleted_at__isnull=False), name='comment_tombstone_idx'),
+        ]
+
     def __str__(self):
         return self.content
-    
\ No newline at end of file
+    
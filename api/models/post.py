@@ -1,7 +1,9 @@
 from django.db import models
 from django.contrib.auth.models import User
 from .category import Category
-class Post(models.Model):
+from .soft_delete import SoftDeleteModel
+from .change_log import ChangeLoggedModel
+class Post(ChangeLoggedModel, SoftDeleteModel):
     title = models.CharField(max_length=200, blank=False, null=False)
     author = models.ForeignKey(User, on_delete=models.CASCADE)
     category = models.ForeignKey(Category, on_delete=models.CASCADE)
@@ -9,6 +11,15 @@ class Post(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    # Posts of a soft-deleted category are hidden until purged
+    soft_delete_parents = ('category',)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['category'], condition=models.Q(deleted_at__isnull=True), name='post_live_category_idx'),
+            models.Index(fields=['deleted_at'], condition=models.Q(deleted_at__isnull=False), name='post_tombstone_idx'),
+        ]
+
     def __str__(self):
         return self.title
 
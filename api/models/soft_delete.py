@@ -0,0 +1,43 @@
+from django.db import models
+from django.utils import timezone
+
+
+class SoftDeleteQuerySet(models.QuerySet):
+    def alive(self):
+        return self.filter(deleted_at__isnull=True)
+
+
+class SoftDeleteManager(models.Manager.from_queryset(SoftDeleteQuerySet)):
+    """
+    Default manager that hides tombstoned rows, and rows whose parent
+    (see `SoftDeleteModel.soft_delete_parents`) has been tombstoned.
+    """
+
+    def get_queryset(self):
+        queryset = super().get_queryset().alive()
+        for parent in self.model.soft_delete_parents:
+            queryset = queryset.filter(**{f'{parent}__deleted_at__isnull': True})
+        return queryset
+
+
+class SoftDeleteModel(models.Model):
+    deleted_at = models.DateTimeField(null=True, blank=True, editable=False)
+
+    # FK paths whose tombstone also hides this row, e.g. a comment
+    # disappears as soon as its post is soft-deleted
+    soft_delete_parents = ()
+
+    objects = SoftDeleteManager()
+    # Includes tombstoned rows; used by the purge command
+    all_objects = SoftDeleteQuerySet.as_manager()
+
+    class Meta:
+        abstract = True
+
+    def soft_delete(self):
+        """
+        Mark the row as deleted without touching its children.
+        Children are hidden by their managers and removed later by `purge_deleted`.
+        """
+        self.deleted_at = timezone.now()
+        self.save(update_fields=['deleted_at'])
@@ -0,0 +1,89 @@
+import math
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.conf import settings
+from django.db import models, transaction
+from django.utils import timezone
+from .post import Post
+
+# Scores are stored as log(sum(exp(decay_rate * (t - EPOCH)))) over a post's
+# comment times t. Decaying every score by the same factor never changes their
+# order, so the table stays correctly ranked without rewriting rows as time passes.
+EPOCH = datetime(2025, 1, 1, tzinfo=dt_timezone.utc)
+
+# Comments older than this many half-lives are left out of a rebuild
+WINDOW_HALF_LIVES = 7
+
+
+def decay_rate():
+    return math.log(2) / (settings.TRENDING_HALF_LIFE_HOURS * 3600)
+
+
+def comment_weight(created_at):
+    """Log-space weight of a single comment made at `created_at`"""
+    return decay_rate() * (created_at - EPOCH).total_seconds()
+
+
+def log_add(a, b):
+    high, low = max(a, b), min(a, b)
+    return high + math.log1p(math.exp(low - high))
+
+
+def trending_window(half_lives=WINDOW_HALF_LIVES):
+    return timedelta(hours=settings.TRENDING_HALF_LIFE_HOURS * half_lives)
+
+
+def build_scores(comments):
+    """Sum the weights of `(post_id, created_at)` pairs into a score per post"""
+    scores = {}
+    for post_id, created_at in comments:
+        weight = comment_weight(created_at)
+        scores[post_id] = log_add(scores[post_id], weight) if post_id in scores else weight
+    return scores
+
+
+class TrendingPost(models.Model):
+    """Precomputed trending ranking, one row per post with recent comment activity"""
+    post = models.OneToOneField(Post, on_delete=models.CASCADE, primary_key=True, related_name='trending')
+    score = models.FloatField()
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['-score'], name='trending_score_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.post_id}: {self.score}'
+
+    @classmethod
+    def record_comment(cls, comment):
+        """Add a newly created comment's weight to its post's score"""
+        weight = comment_weight(comment.created_at)
+        with transaction.atomic():
+            # get_or_create recovers from a concurrent first comment creating the row
+            entry, created = cls.objects.select_for_update().get_or_create(
+                post_id=comment.post_id, defaults={'score': weight}
+            )
+            if created:
+                return
+            entry.score = log_add(entry.score, weight)
+            entry.save(update_fields=['score', 'updated_at'])
+
+    @classmethod
+    def discard_comment(cls, comment):
+        """Remove a deleted comment's weight from its post's score"""
+        # A rebuild never counted comments from before its window
+        if comment.created_at < timezone.now() - trending_window():
+            return
+        weight = comment_weight(comment.created_at)
+        with transaction.atomic():
+            entry = cls.objects.select_for_update().filter(post_id=comment.post_id).first()
+            if entry is None:
+                return
+            # Nothing meaningful left once the remaining weight is within float noise
+            if weight >= entry.score - 1e-9:
+                entry.delete()
+                return
+            entry.score = entry.score + math.log1p(-math.exp(weight - entry.score))
+            entry.save(update_fields=['score', 'updated_at'])
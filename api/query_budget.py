@@ -0,0 +1,129 @@
+import logging
+import re
+
+from django.conf import settings
+from django.db import connection
+
+logger = logging.getLogger(__name__)
+
+_IN_LIST = re.compile(r'\bIN \((?:%s, )*%s\)')
+_NUMBER = re.compile(r'\b\d+\b')
+# Transaction control is issued differently per backend, so it isn't counted
+_TRANSACTION_CONTROL = ('BEGIN', 'COMMIT', 'ROLLBACK', 'SAVEPOINT', 'RELEASE SAVEPOINT')
+
+
+def fingerprint(sql):
+    """Normalize SQL so the same query shape with different values or IN-list lengths compares equal"""
+    return _NUMBER.sub('?', _IN_LIST.sub('IN (...)', sql))
+
+
+def query_budget(queries):
+    """
+    Declare the query budget of a function view. Apply it above @api_view:
+
+        @query_budget(2)
+        @api_view(['GET'])
+        def some_view(request): ...
+
+    Class-based views declare `query_budgets` instead, keyed by viewset action
+    (or by lowercase HTTP method for plain APIViews).
+    """
+    def decorator(view):
+        view.query_budget = queries
+        return view
+    return decorator
+
+
+def get_query_budget(view_func, method):
+    """Return the declared budget for `view_func` handling `method`, or None if undeclared"""
+    if hasattr(view_func, 'query_budget'):
+        return view_func.query_budget
+    budgets = getattr(getattr(view_func, 'cls', None), 'query_budgets', None)
+    if budgets is None:
+        return None
+    actions = getattr(view_func, 'actions', None)
+    key = actions.get(method.lower()) if actions else method.lower()
+    return budgets.get(key)
+
+
+class QueryRecorder:
+    """
+    Counts queries. Statements are only kept once the count has passed the
+    budget, so requests within budget cost a counter increment per query.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.budget = None
+        self.over_budget = []
+
+    def __call__(self, execute, sql, params, many, context):
+        if not sql[:17].upper().startswith(_TRANSACTION_CONTROL):
+            self.count += 1
+            if self.budget is not None and self.count > self.budget:
+                self.over_budget.append(sql)
+        return execute(sql, params, many, context)
+
+    def fingerprints(self):
+        """Distinct shapes of the queries run past the budget, most repeated first"""
+        counts = {}
+        for sql in self.over_budget:
+            shape = fingerprint(sql)
+            counts[shape] = counts.get(shape, 0) + 1
+        return sorted(counts.items(), key=lambda item: item[1], reverse=True)
+
+
+class QueryBudgetMiddleware:
+    """
+    Counts the queries run for each request and compares them with the view's
+    declared budget. Controlled by settings.QUERY_BUDGET_MODE:
+      'off' - do nothing
+      'log' - log a structured warning when a budget is exceeded (default)
+    The count, budget and recorder are also attached to the response for
+    `api.testing.QueryBudgetTestMixin`.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if settings.QUERY_BUDGET_MODE == 'off':
+            return self.get_response(request)
+
+        recorder = request.query_recorder = QueryRecorder()
+        with connection.execute_wrapper(recorder):
+            response = self.get_response(request)
+
+        budget = recorder.budget
+        if budget is None:
+            return response
+
+        response.query_budget = budget
+        response.query_count = recorder.count
+        response.query_recorder = recorder
+        if recorder.count > budget:
+            logger.warning(
+                'Query budget exceeded: %s %s ran %d queries (budget %d)',
+                request.method, request.path, response.query_count, budget,
+                extra={
+                    'query_budget': {
+                        'method': request.method,
+                        'path': request.path,
+                        'view': request.query_budget_view,
+                        'budget': budget,
+                        'count': response.query_count,
+                        'fingerprints': [
+                            {'sql': sql, 'count': count} for sql, count in recorder.fingerprints()
+                        ],
+                    },
+                },
+            )
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        recorder = getattr(request, 'query_recorder', None)
+        if recorder is None:
+            return None
+        recorder.budget = get_query_budget(view_func, request.method)
+        request.query_budget_view = getattr(getattr(view_func, 'cls', view_func), '__name__', repr(view_func))
+        return None
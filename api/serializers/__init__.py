@@ -2,5 +2,6 @@ from .post_serializer import PostSerializer
 from .user_serializer import UserSerializer
 from .comment_serializer import CommentSerializer
 from .category_serializer import CategorySerializer
+from .attachment_serializer import AttachmentSerializer
 
-__all__ = ['PostSerializer', 'UserSerializer', 'CommentSerializer', 'CategorySerializer']
\ No newline at end of file
+__all__ = ['PostSerializer', 'UserSerializer', 'CommentSerializer', 'CategorySerializer', 'AttachmentSerializer']
\ No newline at end of file
@@ -0,0 +1,10 @@
+from rest_framework import serializers
+from api.models import Attachment
+
+class AttachmentSerializer(serializers.ModelSerializer):
+    url = serializers.FileField(source='file', read_only=True)
+    thumbnail_url = serializers.FileField(source='thumbnail', read_only=True)
+
+    class Meta:
+        model = Attachment
+        fields = ['id', 'url', 'thumbnail_url', 'content_type', 'size', 'created_at']
\ No newline at end of file
@@ -4,4 +4,4 @@ from api.models import Category
 class CategorySerializer(serializers.ModelSerializer):
     class Meta:
         model = Category
-        fields = '__all__'
\ No newline at end of file
+        exclude = ['deleted_at']
\ No newline at end of file
@@ -2,6 +2,7 @@ from rest_framework import serializers
 from django.contrib.auth.models import User
 from api.models import Post
 from api.models.category import Category
+from .attachment_serializer import AttachmentSerializer
 
 class AuthorSerializer(serializers.ModelSerializer):
     """Serializer for displaying minimal author info in posts"""
@@ -18,6 +19,8 @@ class PostSerializer(serializers.ModelSerializer):
     # Nested serializers for reading (GET requests)
     author = AuthorSerializer(read_only=True)
     category = CategorySerializer(read_only=True)
+    # Attachments are referenced by URL; file contents never travel in post payloads
+    attachments = AttachmentSerializer(many=True, read_only=True)
     
     # Fields for writing (POST/PUT requests)
     author_id = serializers.PrimaryKeyRelatedField(
@@ -34,5 +37,5 @@ class PostSerializer(serializers.ModelSerializer):
     
     class Meta:
         model = Post
-        fields = ['id', 'title', 'author', 'author_id', 'category', 'category_id', 'content', 'created_at', 'updated_at']
+        fields = ['id', 'title', 'author', 'author_id', 'category', 'category_id', 'content', 'attachments', 'created_at', 'updated_at']
         read_only_fields = ['id', 'created_at', 'updated_at']
\ No newline at end of file
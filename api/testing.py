@@ -0,0 +1,17 @@
+class QueryBudgetTestMixin:
+    """
+    TestCase mixin that fails when a response ran more queries than its view's
+    declared budget (see api.query_budget). Requires QueryBudgetMiddleware.
+    """
+
+    def assertWithinQueryBudget(self, response):
+        path = response.wsgi_request.path
+        budget = getattr(response, 'query_budget', None)
+        if budget is None:
+            self.fail(f'{response.wsgi_request.method} {path} has no query budget declared')
+        if response.query_count > budget:
+            shapes = '\n'.join(f'  {count}x {sql}' for sql, count in response.query_recorder.fingerprints())
+            self.fail(
+                f'{response.wsgi_request.method} {path} ran {response.query_count} queries '
+                f'(budget {budget}); queries past the budget:\n{shapes}'
+            )
@@ -1,3 +1,552 @@
-from django.test import TestCase
+import io
+import math
+import os
+import shutil
+import tempfile
+import threading
+from datetime import timedelta
+from io import StringIO
+from unittest import mock, skipUnless
 
-# Create your tests here.
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection, connections, transaction
+from django.test import TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient, APITestCase, APITransactionTestCase
+
+from api.checks import check_query_budgets
+from api.models import Attachment, Category, Post, Comment, TrendingPost, ChangeLog
+from api.models.trending import comment_weight, trending_window
+from api.thumbnails import generate_thumbnail
+from api.testing import QueryBudgetTestMixin
+from api.views import PostView
+
+
+class QueryBudgetTests(QueryBudgetTestMixin, APITestCase):
+    """
+    Hits every endpoint in api/urls.py with several rows in play, so a per-row
+    query added to a serializer pushes the endpoint over its declared budget.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_user('admin', password='admin-password', is_staff=True)
+        cls.users = [User.objects.create_user(f'user{i}', password='user-password') for i in range(3)]
+        cls.categories = [
+            Category.objects.create(name=f'Category {i}', slug=f'category-{i}', description='...')
+            for i in range(3)
+        ]
+        cls.posts = [
+            Post.objects.create(title=f'Post {i}', author=cls.users[i % 3], category=cls.categories[i % 3], content='...')
+            for i in range(5)
+        ]
+        for post in cls.posts:
+            for user in cls.users:
+                Comment.objects.create(post=post, author=user, content='...')
+
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root, ignore_errors=True)
+        self.author = self.users[0]
+        self.post = self.posts[0]
+        self.comment = Comment.objects.filter(author=self.author).first()
+        self.authenticate(self.author)
+
+    def authenticate(self, user):
+        token, _ = Token.objects.get_or_create(user=user)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {token.key}')
+
+    def assertBudget(self, response, status_code):
+        self.assertEqual(response.status_code, status_code, getattr(response, 'data', None))
+        self.assertWithinQueryBudget(response)
+
+    def test_all_endpoints_declare_budgets(self):
+        self.assertEqual(check_query_budgets(None), [])
+
+    def test_post_endpoints(self):
+        post_url = f'/api/posts/{self.post.id}/'
+        self.assertBudget(self.client.get('/api/posts/'), 200)
+        self.assertBudget(self.client.get(post_url), 200)
+        self.assertBudget(self.client.get(f'{post_url}comments/'), 200)
+        self.assertBudget(self.client.get('/api/posts/trending/'), 200)
+        self.assertBudget(self.client.post('/api/posts/', {'title': 'New', 'category_id': self.categories[0].id, 'content': '...'}), 201)
+        self.assertBudget(self.client.patch(post_url, {'title': 'Edited'}), 200)
+        self.assertBudget(self.client.put(post_url, {'title': 'Edited', 'category_id': self.categories[1].id, 'content': '...'}), 200)
+        self.assertBudget(self.client.delete(post_url), 204)
+
+    def test_attachment_endpoints(self):
+        url = f'/api/posts/{self.post.id}/attachments/'
+        with override_settings(MEDIA_ROOT=self.media_root):
+            upload = SimpleUploadedFile('notes.txt', b'hello', content_type='text/plain')
+            self.assertBudget(self.client.post(url, {'file': upload}, format='multipart'), 201)
+        self.assertBudget(self.client.get(url), 200)
+
+    def test_comment_endpoints(self):
+        comment_url = f'/api/comments/{self.comment.id}/'
+        self.assertBudget(self.client.get('/api/comments/'), 200)
+        self.assertBudget(self.client.get(f'/api/comments/?post={self.post.id}'), 200)
+        self.assertBudget(self.client.get(comment_url), 200)
+        self.assertBudget(self.client.post('/api/comments/', {'post_id': self.post.id, 'content': '...'}), 201)
+        self.assertBudget(self.client.patch(comment_url, {'content': 'Edited'}), 200)
+        self.assertBudget(self.client.put(comment_url, {'post_id': self.post.id, 'content': 'Edited'}), 200)
+        self.assertBudget(self.client.put(comment_url, {'post_id': self.posts[1].id, 'content': 'Moved'}), 200)
+        self.assertBudget(self.client.delete(comment_url), 204)
+
+    def test_category_endpoints(self):
+        self.authenticate(self.admin)
+        category_url = f'/api/categories/{self.categories[0].id}/'
+        self.assertBudget(self.client.get('/api/categories/'), 200)
+        self.assertBudget(self.client.get(category_url), 200)
+        self.assertBudget(self.client.post('/api/categories/', {'name': 'New', 'slug': 'new', 'description': '...'}), 201)
+        self.assertBudget(self.client.patch(category_url, {'name': 'Edited'}), 200)
+        self.assertBudget(self.client.put(category_url, {'name': 'Edited', 'slug': 'edited', 'description': '...'}), 200)
+        self.assertBudget(self.client.delete(category_url), 204)
+
+    def test_auth_and_user_endpoints(self):
+        self.assertBudget(self.client.get('/api/auth/profile/'), 200)
+        ids = ','.join(str(user.id) for user in self.users)
+        self.assertBudget(self.client.get(f'/api/users/?ids={ids}'), 200)
+        self.assertBudget(self.client.get('/api/changes/'), 200)
+        self.assertBudget(self.client.get('/api/changes/?since=0.0'), 200)
+        self.assertBudget(self.client.post('/api/auth/logout/'), 200)
+
+        self.client.credentials()
+        self.assertBudget(self.client.post('/api/auth/register/', {'username': 'newcomer', 'email': 'new@example.com', 'password': 'new-password'}), 201)
+        self.assertBudget(self.client.post('/api/auth/login/', {'username': 'admin', 'password': 'admin-password'}), 200)
+
+    def test_exceeded_budget_is_logged(self):
+        with mock.patch.dict(PostView.query_budgets, {'list': 1}):
+            with self.assertLogs('api.query_budget', level='WARNING') as logs:
+                response = self.client.get('/api/posts/')
+        record = logs.records[0].query_budget
+        self.assertEqual(record['budget'], 1)
+        self.assertEqual(record['count'], response.query_count)
+        # Only the queries past the budget are kept and fingerprinted
+        self.assertEqual(sum(shape['count'] for shape in record['fingerprints']), response.query_count - 1)
+
+    def test_within_budget_only_counts(self):
+        with mock.patch('api.query_budget.fingerprint') as fingerprint:
+            response = self.client.get('/api/posts/')
+        self.assertWithinQueryBudget(response)
+        self.assertEqual(response.query_recorder.over_budget, [])
+        fingerprint.assert_not_called()
+
+
+class SoftDeleteTests(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user('author', password='author-password')
+        cls.admin = User.objects.create_user('admin', password='admin-password', is_staff=True)
+        cls.category = Category.objects.create(name='Category', slug='category', description='...')
+        cls.post = Post.objects.create(title='Post', author=cls.author, category=cls.category, content='...')
+        cls.comments = [Comment.objects.create(post=cls.post, author=cls.author, content='...') for _ in range(5)]
+
+    def test_deleting_post_hides_its_comments(self):
+        self.client.force_authenticate(self.author)
+        self.assertEqual(self.client.delete(f'/api/posts/{self.post.id}/').status_code, 204)
+
+        self.assertFalse(Post.objects.filter(pk=self.post.pk).exists())
+        self.assertEqual(Comment.objects.count(), 0)
+        self.assertEqual(self.client.get('/api/comments/').data, [])
+        # Nothing is removed until the purge runs
+        self.assertEqual(Comment.all_objects.count(), 5)
+        self.assertIsNone(Comment.all_objects.first().deleted_at)
+
+    def test_deleting_category_hides_its_posts_and_comments(self):
+        self.client.force_authenticate(self.admin)
+        self.assertEqual(self.client.delete(f'/api/categories/{self.category.id}/').status_code, 204)
+
+        self.assertEqual(self.client.get('/api/posts/').data, [])
+        self.assertEqual(self.client.get(f'/api/posts/{self.post.id}/').status_code, 404)
+        self.assertEqual(Comment.objects.count(), 0)
+
+    def test_purge_removes_children_first_in_batches(self):
+        self.post.soft_delete()
+        out = StringIO()
+        with CaptureQueriesContext(connection) as queries:
+            call_command('purge_deleted', batch_size=2, stdout=out)
+
+        self.assertEqual(Comment.all_objects.count(), 0)
+        self.assertEqual(Post.all_objects.count(), 0)
+        self.assertEqual(Category.all_objects.count(), 1)
+        self.assertEqual(out.getvalue().splitlines(), [
+            'Purged 5 Comment rows',
+            'Purged 1 Post rows',
+            'Purged 0 Category rows',
+            'Removed 0 unreferenced files',
+        ])
+        # 5 comments in batches of 2, all before the post itself is deleted
+        deleted_tables = [q['sql'].split('"')[1] for q in queries if q['sql'].startswith('DELETE FROM')]
+        self.assertEqual(deleted_tables[:3], ['api_comment'] * 3)
+        self.assertIn('api_post', deleted_tables[3:])
+
+    def test_purge_respects_grace_period(self):
+        self.comments[0].soft_delete()
+        call_command('purge_deleted', grace_minutes=60, stdout=StringIO())
+        self.assertEqual(Comment.all_objects.count(), 5)
+
+
+class TrendingTests(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user('author', password='author-password')
+        cls.category = Category.objects.create(name='Category', slug='category', description='...')
+        cls.posts = [
+            Post.objects.create(title=f'Post {i}', author=cls.author, category=cls.category, content='...')
+            for i in range(3)
+        ]
+
+    def comment(self, post, **kwargs):
+        return Comment.objects.create(post=post, author=self.author, content='...', **kwargs)
+
+    def score(self, post):
+        return TrendingPost.objects.get(post=post).score
+
+    def test_scores_add_and_subtract_in_log_space(self):
+        post = self.posts[0]
+        first, second = self.comment(post), self.comment(post)
+        Comment.objects.filter(pk=second.pk).update(created_at=first.created_at)
+        second.refresh_from_db()
+
+        TrendingPost.record_comment(first)
+        self.assertAlmostEqual(self.score(post), comment_weight(first.created_at))
+        TrendingPost.record_comment(second)
+        # Two comments made at the same moment are worth twice one of them
+        self.assertAlmostEqual(self.score(post), comment_weight(first.created_at) + math.log(2))
+
+        TrendingPost.discard_comment(second)
+        self.assertAlmostEqual(self.score(post), comment_weight(first.created_at))
+        TrendingPost.discard_comment(first)
+        self.assertFalse(TrendingPost.objects.filter(post=post).exists())
+
+    def test_newer_comments_outweigh_older_ones_by_half_life(self):
+        now = timezone.now()
+        old = self.comment(self.posts[0])
+        new = self.comment(self.posts[1])
+        Comment.objects.filter(pk=old.pk).update(created_at=now - timedelta(hours=settings.TRENDING_HALF_LIFE_HOURS))
+        Comment.objects.filter(pk=new.pk).update(created_at=now)
+        old.refresh_from_db()
+        new.refresh_from_db()
+
+        TrendingPost.record_comment(old)
+        TrendingPost.record_comment(new)
+        self.assertAlmostEqual(self.score(self.posts[1]) - self.score(self.posts[0]), math.log(2))
+
+    def test_trending_endpoint_ranks_by_activity(self):
+        self.client.force_authenticate(self.author)
+        for post, count in zip(self.posts, [1, 3, 2]):
+            for _ in range(count):
+                self.client.post('/api/comments/', {'post_id': post.id, 'content': '...'})
+
+        titles = [post['title'] for post in self.client.get('/api/posts/trending/').data]
+        self.assertEqual(titles, ['Post 1', 'Post 2', 'Post 0'])
+
+    def test_moving_a_comment_moves_its_weight(self):
+        self.client.force_authenticate(self.author)
+        comment_id = self.client.post('/api/comments/', {'post_id': self.posts[0].id, 'content': '...'}).data['id']
+        weight = comment_weight(Comment.objects.get(pk=comment_id).created_at)
+
+        response = self.client.patch(f'/api/comments/{comment_id}/', {'post_id': self.posts[1].id})
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(TrendingPost.objects.filter(post=self.posts[0]).exists())
+        self.assertAlmostEqual(self.score(self.posts[1]), weight)
+
+    def test_discarding_a_comment_older_than_the_window_is_a_no_op(self):
+        recent, old = self.comment(self.posts[0]), self.comment(self.posts[0])
+        TrendingPost.record_comment(recent)
+        Comment.objects.filter(pk=old.pk).update(created_at=timezone.now() - trending_window() - timedelta(hours=1))
+        old.refresh_from_db()
+
+        # A rebuild never counted `old`, so deleting it must not eat into `recent`
+        TrendingPost.discard_comment(old)
+        self.assertAlmostEqual(self.score(self.posts[0]), comment_weight(recent.created_at))
+
+    def test_refresh_matches_incremental_scores(self):
+        for post, count in zip(self.posts, [1, 3, 2]):
+            for _ in range(count):
+                TrendingPost.record_comment(self.comment(post))
+        incremental = dict(TrendingPost.objects.values_list('post_id', 'score'))
+
+        call_command('refresh_trending', stdout=StringIO())
+        rebuilt = dict(TrendingPost.objects.values_list('post_id', 'score'))
+        self.assertEqual(rebuilt.keys(), incremental.keys())
+        for post_id, score in incremental.items():
+            self.assertAlmostEqual(rebuilt[post_id], score)
+
+
+class UserLookupTests(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.users = [User.objects.create_user(f'user{i}', password='user-password') for i in range(3)]
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_authenticate(self.users[0])
+
+    def test_returns_authors_in_request_order(self):
+        ids = [self.users[2].id, self.users[0].id, 999999]
+        response = self.client.get('/api/users/', {'ids': ','.join(map(str, ids))})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([user['username'] for user in response.data], ['user2', 'user0'])
+
+    def test_requires_authentication(self):
+        self.client.force_authenticate(None)
+        self.assertEqual(self.client.get('/api/users/', {'ids': '1'}).status_code, 401)
+
+    def test_rejects_bad_ids(self):
+        for ids in ['abc', '0', '-1', '+1', ' 1', '1_0', '99999999999999999999', ','.join(map(str, range(1, 102)))]:
+            with self.subTest(ids=ids):
+                self.assertEqual(self.client.get('/api/users/', {'ids': ids}).status_code, 400)
+
+    def test_is_throttled(self):
+        with mock.patch('api.views.user_view.UserLookupThrottle.get_rate', return_value='2/minute'):
+            statuses = [self.client.get('/api/users/', {'ids': '1'}).status_code for _ in range(3)]
+        self.assertEqual(statuses, [200, 200, 429])
+
+
+class ChangeFeedTests(APITransactionTestCase):
+    # On Postgres the feed withholds entries of transactions that are still open,
+    # which would include the transaction APITestCase wraps each test in
+
+    def setUp(self):
+        self.author = User.objects.create_user('author', password='author-password')
+        self.category = Category.objects.create(name='Category', slug='category', description='...')
+
+    def head(self):
+        return self.client.get('/api/changes/').data['next']
+
+    def changes(self, since):
+        response = self.client.get('/api/changes/', {'since': since})
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def test_latest_action_wins(self):
+        since = self.head()
+        kept = Post.objects.create(title='Kept', author=self.author, category=self.category, content='...')
+        kept.title = 'Edited'
+        kept.save()
+        removed = Post.objects.create(title='Removed', author=self.author, category=self.category, content='...')
+        removed.soft_delete()
+
+        data = self.changes(since)
+        self.assertEqual([post['title'] for post in data['changes']['posts']['upserted']], ['Edited'])
+        self.assertEqual(data['changes']['posts']['deleted'], [removed.id])
+        self.assertEqual(data['next'], self.head())
+        self.assertEqual(self.changes(data['next'])['changes']['posts'], {'upserted': [], 'deleted': []})
+
+    def test_comments_hidden_by_deleted_parent_are_reported_deleted(self):
+        post = Post.objects.create(title='Post', author=self.author, category=self.category, content='...')
+        since = self.head()
+        comment = Comment.objects.create(post=post, author=self.author, content='...')
+        post.soft_delete()
+
+        data = self.changes(since)
+        self.assertEqual(data['changes']['comments']['deleted'], [comment.id])
+        self.assertEqual(data['changes']['posts']['deleted'], [post.id])
+
+    def test_compacted_token_is_gone(self):
+        since = self.head()
+        for i in range(3):
+            Post.objects.create(title=f'Post {i}', author=self.author, category=self.category, content='...')
+        ChangeLog.objects.update(created_at=timezone.now() - timedelta(days=40))
+        call_command('compact_changes', stdout=StringIO())
+
+        self.assertEqual(self.client.get('/api/changes/', {'since': since}).status_code, 410)
+        self.assertEqual(self.client.get('/api/changes/', {'since': self.head()}).status_code, 200)
+
+    def test_token_ahead_of_head_is_gone(self):
+        txid, seq = map(int, self.head().split('.'))
+        for since in [f'{txid}.{seq + 1}', f'{txid + 1}.0', '99999999999999999999.0']:
+            with self.subTest(since=since):
+                self.assertEqual(self.client.get('/api/changes/', {'since': since}).status_code, 410)
+
+    def test_malformed_token_is_rejected(self):
+        for since in ['1', '-1.0', '1.2.3', '1.+2', '']:
+            with self.subTest(since=since):
+                self.assertEqual(self.client.get('/api/changes/', {'since': since}).status_code, 400)
+
+
+@skipUnless(connection.vendor == 'postgresql', 'Concurrent commits need a database with real row-level concurrency')
+class ChangeFeedOrderingTests(TransactionTestCase):
+    """
+    Transaction A appends to the log first but commits last. Its entry must not be
+    skipped by a client that polls after B's change but before A commits.
+    """
+
+    def test_out_of_order_commit_is_not_skipped(self):
+        author = User.objects.create_user('author', password='author-password')
+        category = Category.objects.create(name='Category', slug='category', description='...')
+        client = APIClient()
+        token = client.get('/api/changes/').data['next']
+        a_saved, release_a = threading.Event(), threading.Event()
+        created = {}
+
+        def create_post(title, before_commit=None):
+            try:
+                with transaction.atomic():
+                    created[title] = Post.objects.create(title=title, author=author, category=category, content='...').id
+                    if before_commit:
+                        before_commit()
+            finally:
+                connections.close_all()
+
+        def hold_a():
+            a_saved.set()
+            release_a.wait(10)
+
+        first = threading.Thread(target=create_post, args=('A', hold_a))
+        first.start()
+        a_saved.wait(10)
+        # B doesn't wait for A, but its entry is held back until A has finished
+        create_post('B')
+
+        seen = set()
+        data = client.get('/api/changes/', {'since': token}).data
+        self.assertEqual(data['changes']['posts']['upserted'], [])
+        release_a.set()
+        first.join()
+        data = client.get('/api/changes/', {'since': data['next']}).data
+        seen.update(post['id'] for post in data['changes']['posts']['upserted'])
+
+        self.assertEqual(seen, {created['A'], created['B']})
+
+
+class AttachmentTests(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user('author', password='author-password')
+        cls.category = Category.objects.create(name='Category', slug='category', description='...')
+        cls.posts = [
+            Post.objects.create(title=f'Post {i}', author=cls.author, category=cls.category, content='...')
+            for i in range(2)
+        ]
+
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        settings_override = override_settings(MEDIA_ROOT=media_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.media_root = media_root
+        self.client.force_authenticate(self.author)
+
+    def upload(self, post, content, name='image.png', content_type='image/png'):
+        upload = SimpleUploadedFile(name, content, content_type=content_type)
+        return self.client.post(f'/api/posts/{post.id}/attachments/', {'file': upload}, format='multipart')
+
+    def stored_files(self):
+        return sorted(
+            os.path.relpath(os.path.join(root, name), self.media_root)
+            for root, _, names in os.walk(self.media_root) for name in names
+        )
+
+    def png(self):
+        from PIL import Image
+        buffer = io.BytesIO()
+        Image.new('RGB', (800, 600), 'red').save(buffer, 'PNG')
+        return buffer.getvalue()
+
+    def test_identical_uploads_share_one_file_and_thumbnail(self):
+        content = self.png()
+        first = self.upload(self.posts[0], content)
+        self.assertEqual(first.status_code, 201)
+        generate_thumbnail(Attachment.objects.get().sha256)
+
+        second = self.upload(self.posts[1], content)
+        self.assertEqual(second.status_code, 201)
+        self.assertEqual(second.data['url'], first.data['url'])
+        self.assertIsNotNone(second.data['thumbnail_url'])
+        self.assertEqual(len(self.stored_files()), 2)
+
+    def updated_posts(self):
+        return sorted(ChangeLog.objects.filter(model='post', action=ChangeLog.UPDATED).values_list('object_id', flat=True))
+
+    def test_upload_and_thumbnail_are_logged_as_post_updates(self):
+        content = self.png()
+        self.upload(self.posts[0], content)
+        self.assertEqual(self.updated_posts(), [self.posts[0].id])
+        self.upload(self.posts[1], content)
+
+        ChangeLog.objects.all().delete()
+        generate_thumbnail(Attachment.objects.first().sha256)
+        self.assertEqual(self.updated_posts(), [self.posts[0].id, self.posts[1].id])
+
+    def test_racing_thumbnail_jobs_keep_one_file(self):
+        self.upload(self.posts[0], self.png())
+        sha256 = Attachment.objects.get().sha256
+        from PIL import Image
+        resize = Image.Image.thumbnail
+        raced = []
+
+        def resize_while_racing_job_finishes(image, size):
+            # Another job for the same content saves and attaches its thumbnail first
+            if not raced:
+                raced.append(True)
+                generate_thumbnail(sha256)
+            return resize(image, size)
+
+        with mock.patch.object(Image.Image, 'thumbnail', autospec=True, side_effect=resize_while_racing_job_finishes):
+            generate_thumbnail(sha256)
+
+        attachment = Attachment.objects.get()
+        self.assertEqual(attachment.thumbnail.name, f'thumbnails/{sha256[:2]}/{sha256}.jpg')
+        self.assertEqual(self.stored_files(), sorted([attachment.file.name, attachment.thumbnail.name]))
+
+    def test_purge_removes_files_once_unreferenced(self):
+        content = self.png()
+        self.upload(self.posts[0], content)
+        generate_thumbnail(Attachment.objects.get().sha256)
+        self.upload(self.posts[1], content)
+        self.upload(self.posts[1], b'notes', name='notes.txt', content_type='text/plain')
+        self.assertEqual(len(self.stored_files()), 3)
+
+        self.posts[0].soft_delete()
+        call_command('purge_deleted', stdout=StringIO())
+        # The image and its thumbnail are still used by the other post
+        self.assertEqual(len(self.stored_files()), 3)
+
+        self.posts[1].soft_delete()
+        out = StringIO()
+        call_command('purge_deleted', stdout=out)
+        self.assertIn('Removed 3 unreferenced files', out.getvalue())
+        self.assertEqual(self.stored_files(), [])
+
+    def test_upload_does_not_reuse_files_of_deleted_posts(self):
+        self.upload(self.posts[0], b'notes', name='notes.txt', content_type='text/plain')
+        self.posts[0].soft_delete()
+        self.upload(self.posts[1], b'notes', name='notes.txt', content_type='text/plain')
+
+        call_command('purge_deleted', stdout=StringIO())
+        self.assertEqual(len(self.stored_files()), 1)
+        attachment = Attachment.objects.get()
+        self.assertTrue(attachment.file.storage.exists(attachment.file.name))
+
+    @override_settings(ATTACHMENTS_ENABLED=False)
+    def test_uploads_are_refused_where_attachments_are_disabled(self):
+        response = self.upload(self.posts[0], b'notes', name='notes.txt', content_type='text/plain')
+        self.assertEqual(response.status_code, 503)
+        self.assertFalse(Attachment.objects.exists())
+        self.assertEqual(self.stored_files(), [])
+
+    @override_settings(ATTACHMENT_MAX_BYTES=1024)
+    def test_oversized_upload_is_stopped_while_streaming(self):
+        # Under the Content-Length allowance, so the running total has to catch it
+        response = self.upload(self.posts[0], b'x' * 4096, name='big.bin', content_type='application/octet-stream')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('limited', response.data['error'])
+        self.assertFalse(Attachment.objects.exists())
+        self.assertEqual(self.stored_files(), [])
+
+    @override_settings(ATTACHMENT_MAX_BYTES=1024)
+    def test_oversized_content_length_is_rejected_up_front(self):
+        with mock.patch('api.uploads.TemporaryFileUploadHandler.receive_data_chunk') as receive:
+            response = self.upload(self.posts[0], b'x' * (128 * 1024), name='big.bin', content_type='application/octet-stream')
+        self.assertEqual(response.status_code, 400)
+        receive.assert_not_called()
+        self.assertFalse(Attachment.objects.exists())
@@ -0,0 +1,79 @@
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import connection, transaction
+
+from api.models import Attachment, Post
+
+logger = logging.getLogger(__name__)
+
+THUMBNAIL_SIZE = (320, 320)
+
+_executor = None
+
+
+def _get_executor():
+    # Created lazily so each server worker process gets its own pool after forking
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=settings.THUMBNAIL_WORKERS, thread_name_prefix='thumbnail')
+    return _executor
+
+
+def schedule_thumbnail(attachment):
+    """Queue thumbnail generation for an image attachment once the upload is committed"""
+    if attachment.thumbnail or not attachment.content_type.startswith('image/'):
+        return
+    sha256 = attachment.sha256
+    transaction.on_commit(lambda: _get_executor().submit(_generate_in_worker, sha256))
+
+
+def _generate_in_worker(sha256):
+    try:
+        generate_thumbnail(sha256)
+    finally:
+        # Worker threads hold their own connection; don't leak it between jobs
+        connection.close()
+
+
+def generate_thumbnail(sha256):
+    try:
+        from PIL import Image
+    except ImportError:
+        logger.warning('Pillow is not installed; skipping thumbnail for %s', sha256)
+        return
+
+    try:
+        attachment = Attachment.objects.filter(sha256=sha256, thumbnail='').first()
+        if attachment is None:
+            return
+        name = f'thumbnails/{sha256[:2]}/{sha256}.jpg'
+        # A job for the same content may already have written it
+        if not default_storage.exists(name):
+            with attachment.file.open('rb') as source, Image.open(source) as image:
+                image.thumbnail(THUMBNAIL_SIZE)
+                buffer = BytesIO()
+                image.convert('RGB').save(buffer, 'JPEG', quality=80)
+            name = default_storage.save(name, ContentFile(buffer.getvalue()))
+        _attach_thumbnail(sha256, name)
+    except Exception:
+        logger.exception('Thumbnail generation failed for %s', sha256)
+
+
+def _attach_thumbnail(sha256, name):
+    with transaction.atomic():
+        # Every attachment sharing this content shares the thumbnail too
+        updated = Attachment.objects.filter(sha256=sha256, thumbnail='').update(thumbnail=name)
+        if updated:
+            # Bump the posts so delta sync clients pick up the thumbnail URL
+            for post in Post.objects.filter(attachments__sha256=sha256).distinct():
+                post.save(update_fields=['updated_at'])
+            return
+    # A concurrent job won the race and saved under another name; drop this copy
+    winner = Attachment.objects.filter(sha256=sha256).values_list('thumbnail', flat=True).first()
+    if winner != name:
+        default_storage.delete(name)
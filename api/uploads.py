@@ -0,0 +1,83 @@
+import hashlib
+import os
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.core.files.uploadhandler import StopUpload, TemporaryFileUploadHandler
+
+from api.models import Attachment, Post
+
+# Allowance for multipart boundaries and part headers on top of the file itself
+MULTIPART_OVERHEAD = 64 * 1024
+
+
+class HashingUploadHandler(TemporaryFileUploadHandler):
+    """
+    Streams every upload straight to a temporary file on disk, whatever its size,
+    and hashes each chunk as it arrives so deduplication needs no second read.
+    Uploads over settings.ATTACHMENT_MAX_BYTES are abandoned mid-stream; the
+    request is then flagged with `attachment_too_large`.
+    """
+
+    def handle_raw_input(self, input_data, META, content_length, boundary, encoding=None):
+        self.too_large = content_length > settings.ATTACHMENT_MAX_BYTES + MULTIPART_OVERHEAD
+
+    def new_file(self, *args, **kwargs):
+        if self.too_large:
+            self.reject()
+        super().new_file(*args, **kwargs)
+        self.sha256 = hashlib.sha256()
+        self.received = 0
+
+    def receive_data_chunk(self, raw_data, start):
+        self.received += len(raw_data)
+        if self.received > settings.ATTACHMENT_MAX_BYTES:
+            self.reject()
+        self.sha256.update(raw_data)
+        return super().receive_data_chunk(raw_data, start)
+
+    def file_complete(self, file_size):
+        upload = super().file_complete(file_size)
+        upload.sha256 = self.sha256.hexdigest()
+        return upload
+
+    def reject(self):
+        # Stop reading the body; the parser closes (and so deletes) the temp file
+        self.request.attachment_too_large = True
+        raise StopUpload(connection_reset=True)
+
+
+def store_upload(upload):
+    """
+    Return (file name, thumbnail name) for an upload handled by HashingUploadHandler.
+    Content already stored for a live post is reused, along with its thumbnail.
+    Attachments of soft-deleted posts are not reused, since `purge_deleted` may
+    be about to remove their files.
+    """
+    existing = (
+        Attachment.objects.filter(sha256=upload.sha256, post__in=Post.objects.all())
+        .values_list('file', 'thumbnail').first()
+    )
+    if existing is not None:
+        upload.close()
+        return existing
+
+    extension = os.path.splitext(upload.name)[1].lower()[:10]
+    name = f'attachments/{upload.sha256[:2]}/{upload.sha256}{extension}'
+    # FileSystemStorage moves the temporary file into place rather than copying it
+    return default_storage.save(name, upload), ''
+
+
+def delete_unreferenced_files(names, batch_size=500):
+    """Delete stored attachment and thumbnail files that no Attachment row references any more"""
+    names = sorted({name for name in names if name})
+    deleted = 0
+    for start in range(0, len(names), batch_size):
+        batch = names[start:start + batch_size]
+        referenced = set(Attachment.objects.filter(file__in=batch).values_list('file', flat=True))
+        referenced.update(Attachment.objects.filter(thumbnail__in=batch).values_list('thumbnail', flat=True))
+        for name in batch:
+            if name not in referenced and default_storage.exists(name):
+                default_storage.delete(name)
+                deleted += 1
+    return deleted
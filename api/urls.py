@@ -2,6 +2,8 @@ from django.urls import path, include
 from rest_framework.routers import DefaultRouter
 from api.views import (PostView, CommentView, CategoryView)
 from api.views.auth_view import RegisterView, login_view, logout_view, profile_view
+from api.views.user_view import users_view
+from api.views.change_view import changes_view
 router = DefaultRouter()
 router.register(r'posts', PostView, basename='post')    
 router.register(r'comments', CommentView, basename='comment')
@@ -14,4 +16,10 @@ urlpatterns = [
     path('auth/login/', login_view, name='login'),
     path('auth/logout/', logout_view, name='logout'),
     path('auth/profile/', profile_view, name='profile'),
+
+    # user lookup
+    path('users/', users_view, name='users'),
+
+    # delta sync
+    path('changes/', changes_view, name='changes'),
 ]
\ No newline at end of file
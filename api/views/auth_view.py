@@ -6,6 +6,7 @@ from rest_framework.authtoken.models import Token
 from django.contrib.auth import authenticate
 from django.contrib.auth.models import User
 from api.serializers import UserSerializer
+from api.query_budget import query_budget
 
 
 class RegisterView(generics.CreateAPIView):
@@ -16,6 +17,7 @@ class RegisterView(generics.CreateAPIView):
     queryset = User.objects.all()
     serializer_class = UserSerializer
     permission_classes = [AllowAny]  # Anyone can register
+    query_budgets = {'post': 7}
     
     def create(self, request, *args, **kwargs):
         serializer = self.get_serializer(data=request.data)
@@ -35,6 +37,7 @@ class RegisterView(generics.CreateAPIView):
         }, status=status.HTTP_201_CREATED)
 
 
+@query_budget(3)
 @api_view(['POST'])
 @permission_classes([AllowAny])
 def login_view(request):
@@ -74,6 +77,7 @@ def login_view(request):
     })
 
 
+@query_budget(2)
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
 def logout_view(request):
@@ -96,6 +100,7 @@ def logout_view(request):
         )
 
 
+@query_budget(1)
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def profile_view(request):
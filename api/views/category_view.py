@@ -6,6 +6,15 @@ from api.serializers import CategorySerializer
 class CategoryView(ModelViewSet):
     queryset = Category.objects.all()
     serializer_class = CategorySerializer
+    # Max queries per request, including the auth token lookup (see api/query_budget.py)
+    query_budgets = {
+        'list': 2,
+        'retrieve': 2,
+        'create': 3,
+        'update': 4,
+        'partial_update': 4,
+        'destroy': 4,
+    }
     
     def get_permissions(self):
         """
@@ -17,3 +26,8 @@ class CategoryView(ModelViewSet):
         else:
             permission_classes = [IsAdminUser]
         return [permission() for permission in permission_classes]
+
+    def perform_destroy(self, instance):
+        # Tombstone only; the category's posts and comments are hidden by their
+        # managers and removed later by `manage.py purge_deleted`
+        instance.soft_delete()
@@ -0,0 +1,97 @@
+from rest_framework import status
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.response import Response
+from rest_framework.permissions import AllowAny
+from api.models import ChangeLog, ChangeLogCompaction, Post, Comment, Category
+from api.serializers import PostSerializer, CommentSerializer, CategorySerializer
+from api.query_budget import query_budget
+
+MAX_CHANGES_PER_PAGE = 500
+
+# model_name -> (response key, live queryset, serializer)
+FEEDS = {
+    'post': ('posts', lambda: Post.objects.select_related('author', 'category').prefetch_related('attachments'), PostSerializer),
+    'comment': ('comments', lambda: Comment.objects.select_related('author'), CommentSerializer),
+    'category': ('categories', lambda: Category.objects.all(), CategorySerializer),
+}
+
+
+def format_token(position):
+    return '{}.{}'.format(*position)
+
+
+def parse_token(token):
+    parts = token.split('.')
+    if len(parts) != 2 or not all(part.isascii() and part.isdigit() for part in parts):
+        return None
+    return int(parts[0]), int(parts[1])
+
+
+@query_budget(8)
+@api_view(['GET'])
+@permission_classes([AllowAny])
+def changes_view(request):
+    """
+    Incremental change feed for delta sync
+    GET /api/changes/            -> current token, to use after a full download
+    GET /api/changes/?since=<token>
+    Returns upserted objects and deleted ids per type, the next token and
+    whether more pages are waiting. Clients should drop comments of deleted
+    posts and posts of deleted categories themselves.
+    Responds 410 when the token is older than the compacted log or newer than
+    anything in it (e.g. after a database restore); clients must then resync.
+    """
+    horizon = ChangeLogCompaction.horizon()
+    since = request.query_params.get('since')
+    if since is None:
+        head = ChangeLog.objects.settled().order_by('-txid', '-seq').values_list('txid', 'seq').first()
+        return Response({'next': format_token(max(head or horizon, horizon))})
+
+    since = parse_token(since)
+    if since is None:
+        return Response(
+            {'error': 'since must be a token returned by this endpoint'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+    # Compaction only drops a prefix of the log, so the token is still good as
+    # long as it is not older than the compacted position. A token past the head
+    # was never issued by this log and would skip changes forever.
+    head = ChangeLog.objects.order_by('-txid', '-seq').values_list('txid', 'seq').first()
+    if since < horizon or since > max(head or horizon, horizon):
+        return Response(
+            {'error': 'Change token has expired, please resync'},
+            status=status.HTTP_410_GONE
+        )
+
+    entries = list(
+        ChangeLog.objects.settled().after(since).in_order()
+        .values_list('txid', 'seq', 'model', 'object_id', 'action')[:MAX_CHANGES_PER_PAGE + 1]
+    )
+    has_more = len(entries) > MAX_CHANGES_PER_PAGE
+    entries = entries[:MAX_CHANGES_PER_PAGE]
+
+    # Only the latest action per object matters
+    latest = {}
+    for txid, seq, model, object_id, action in entries:
+        latest[(model, object_id)] = action
+
+    changes = {}
+    for model, (key, queryset, serializer_class) in FEEDS.items():
+        ids = {object_id for (name, object_id), action in latest.items()
+               if name == model and action != ChangeLog.DELETED}
+        deleted = {object_id for (name, object_id), action in latest.items()
+                   if name == model and action == ChangeLog.DELETED}
+        objects = list(queryset().filter(pk__in=ids)) if ids else []
+        # Anything no longer visible (e.g. its parent was deleted) is reported as deleted
+        deleted |= ids - {obj.pk for obj in objects}
+        changes[key] = {
+            'upserted': serializer_class(objects, many=True, context={'request': request}).data,
+            'deleted': sorted(deleted),
+        }
+
+    return Response({
+        'changes': changes,
+        'next': format_token(entries[-1][:2] if entries else since),
+        'has_more': has_more,
+    })
@@ -1,19 +1,31 @@
+import copy
 from rest_framework.viewsets import ModelViewSet
 from rest_framework.permissions import IsAuthenticatedOrReadOnly
 from rest_framework.exceptions import PermissionDenied
-from api.models import Comment
+from django.db import transaction
+from api.models import Comment, TrendingPost
 from api.serializers import CommentSerializer
 
 class CommentView(ModelViewSet):
     serializer_class = CommentSerializer
     permission_classes = [IsAuthenticatedOrReadOnly]
+    # Max queries per request, including the auth token lookup (see api/query_budget.py)
+    query_budgets = {
+        'list': 2,
+        'retrieve': 2,
+        'create': 6,
+        # Moving a comment to another post also rewrites two trending rows
+        'update': 9,
+        'partial_update': 9,
+        'destroy': 6,
+    }
 
     def get_queryset(self):
         """
         Optionally filter comments by post
         Example: /api/comments/?post=1
         """
-        queryset = Comment.objects.all()
+        queryset = Comment.objects.select_related('author')
         post_id = self.request.query_params.get('post', None)
         
         if post_id is not None:
@@ -23,16 +35,28 @@ class CommentView(ModelViewSet):
 
     def perform_create(self, serializer):
         # Comment model has 'author' field, not 'user'
-        serializer.save(author=self.request.user)
+        # The comment and its trending score change commit together
+        with transaction.atomic():
+            comment = serializer.save(author=self.request.user)
+            TrendingPost.record_comment(comment)
     
     def perform_update(self, serializer):
         # Only allow the author to update their own comment
         if serializer.instance.author != self.request.user:
             raise PermissionDenied('You do not have permission to update this comment.')
-        serializer.save()
+        # Moving a comment to another post moves its trending weight with it
+        previous = copy.copy(serializer.instance)
+        with transaction.atomic():
+            comment = serializer.save()
+            if comment.post_id != previous.post_id:
+                TrendingPost.discard_comment(previous)
+                TrendingPost.record_comment(comment)
     
     def perform_destroy(self, instance):
         # Only allow the author to delete their own comment
         if instance.author != self.request.user:
             raise PermissionDenied('You do not have permission to delete this comment.')
-        instance.delete()
+        # Tombstone only; rows are removed later by `manage.py purge_deleted`
+        with transaction.atomic():
+            instance.soft_delete()
+            TrendingPost.discard_comment(instance)
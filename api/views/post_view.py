@@ -1,17 +1,41 @@
 from rest_framework.viewsets import ModelViewSet
 from rest_framework.permissions import IsAuthenticatedOrReadOnly
 from rest_framework.decorators import action
+from rest_framework.parsers import MultiPartParser
 from rest_framework.response import Response
 from rest_framework.exceptions import PermissionDenied
 from rest_framework import status
+from django.conf import settings
+from django.db import transaction
 
-from api.models import Post
-from api.serializers import PostSerializer, CommentSerializer
+from api.models import Post, TrendingPost, Attachment
+from api.serializers import PostSerializer, CommentSerializer, AttachmentSerializer
+from api.uploads import HashingUploadHandler, store_upload
+from api.thumbnails import schedule_thumbnail
 
 class PostView(ModelViewSet):
-    queryset = Post.objects.all()
+    queryset = Post.objects.select_related('author', 'category').prefetch_related('attachments')
     serializer_class = PostSerializer
     permission_classes = [IsAuthenticatedOrReadOnly]
+    # Max queries per request, including the auth token lookup (see api/query_budget.py)
+    query_budgets = {
+        'list': 3,
+        'retrieve': 3,
+        'create': 5,
+        'update': 7,
+        'partial_update': 7,
+        'destroy': 5,
+        'comments': 4,
+        'trending': 3,
+        'attachments': 7,
+    }
+
+    def initialize_request(self, request, *args, **kwargs):
+        drf_request = super().initialize_request(request, *args, **kwargs)
+        if self.action == 'attachments':
+            # Must be in place before anything (e.g. CSRF checks) reads the body
+            request.upload_handlers = [HashingUploadHandler(request)]
+        return drf_request
 
     def perform_create(self, serializer):
         # Post model has 'author' field, not 'user'
@@ -27,7 +51,8 @@ class PostView(ModelViewSet):
         # Only allow the author to delete their own post
         if instance.author != self.request.user:
             raise PermissionDenied('You do not have permission to delete this post.')
-        instance.delete()
+        # Tombstone only; rows are removed later by `manage.py purge_deleted`
+        instance.soft_delete()
         
     @action(detail=True, methods=['get'])
     def comments(self, request, pk=None):
@@ -36,6 +61,73 @@ class PostView(ModelViewSet):
         Example: /api/posts/1/comments/
         """
         post = self.get_object()
-        comments = post.comment_set.all()
+        comments = post.comment_set.select_related('author')
         serializer = CommentSerializer(comments, many=True)
         return Response(serializer.data)
+
+    @action(detail=False, methods=['get'])
+    def trending(self, request):
+        """
+        Get posts ranked by time-decayed comment activity
+        Example: /api/posts/trending/?limit=10
+        """
+        try:
+            limit = min(max(int(request.query_params.get('limit', 10)), 1), 50)
+        except ValueError:
+            return Response({'error': 'limit must be an integer'}, status=status.HTTP_400_BAD_REQUEST)
+
+        # Top-K walk of the score index; rows for soft-deleted posts are skipped
+        entries = (
+            TrendingPost.objects
+            .filter(post__in=Post.objects.all())
+            .select_related('post__author', 'post__category')
+            .prefetch_related('post__attachments')
+            .order_by('-score')[:limit]
+        )
+        serializer = self.get_serializer([entry.post for entry in entries], many=True)
+        return Response(serializer.data)
+
+    @action(detail=True, methods=['get', 'post'], parser_classes=[MultiPartParser])
+    def attachments(self, request, pk=None):
+        """
+        List or upload attachments for a specific post
+        Example: /api/posts/1/attachments/
+        POST multipart/form-data with a 'file' field (author only)
+        """
+        post = self.get_object()
+        if request.method == 'GET':
+            serializer = AttachmentSerializer(post.attachments.all(), many=True, context={'request': request})
+            return Response(serializer.data)
+
+        if post.author != request.user:
+            raise PermissionDenied('You do not have permission to add attachments to this post.')
+        if not settings.ATTACHMENTS_ENABLED:
+            return Response(
+                {'error': 'Attachments are not available on this deployment'},
+                status=status.HTTP_503_SERVICE_UNAVAILABLE
+            )
+        upload = request.FILES.get('file')
+        if getattr(request, 'attachment_too_large', False):
+            return Response(
+                {'error': f'Attachments are limited to {settings.ATTACHMENT_MAX_BYTES} bytes'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if upload is None:
+            return Response({'error': 'Please provide a file'}, status=status.HTTP_400_BAD_REQUEST)
+
+        file_name, thumbnail_name = store_upload(upload)
+        with transaction.atomic():
+            attachment = Attachment.objects.create(
+                post=post,
+                uploader=request.user,
+                sha256=upload.sha256,
+                file=file_name,
+                thumbnail=thumbnail_name,
+                content_type=upload.content_type or 'application/octet-stream',
+                size=upload.size,
+            )
+            # Logs the post as updated for delta sync clients
+            post.save(update_fields=['updated_at'])
+            schedule_thumbnail(attachment)
+        serializer = AttachmentSerializer(attachment, context={'request': request})
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
@@ -0,0 +1,53 @@
+from rest_framework import status
+from rest_framework.decorators import api_view, permission_classes, throttle_classes
+from rest_framework.response import Response
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.throttling import UserRateThrottle
+from api.loaders import get_author_loader
+from api.query_budget import query_budget
+
+MAX_IDS_PER_REQUEST = 100
+MAX_ID = 2 ** 63 - 1  # BigAutoField range
+
+
+class UserLookupThrottle(UserRateThrottle):
+    # Rate is set by REST_FRAMEWORK['DEFAULT_THROTTLE_RATES']['user_lookup']
+    scope = 'user_lookup'
+
+
+@query_budget(2)
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+@throttle_classes([UserLookupThrottle])
+def users_view(request):
+    """
+    Batch lookup of public author info
+    GET /api/users/?ids=1,2,3
+    Header: Authorization: Token <your-token>
+    Returns [{"id", "username", "is_admin"}, ...] in request order; unknown ids are omitted
+    """
+    raw_ids = request.query_params.get('ids', '')
+    parts = [part for part in raw_ids.split(',') if part]
+    # Plain ASCII digits only; int() alone would also take '+1', ' 1' and '1_0'
+    if not all(part.isascii() and part.isdigit() for part in parts):
+        ids = None
+    else:
+        ids = list(dict.fromkeys(int(part) for part in parts))
+    if ids is None or any(not 1 <= user_id <= MAX_ID for user_id in ids):
+        return Response(
+            {'error': 'ids must be a comma-separated list of integers'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+    if not ids:
+        return Response(
+            {'error': 'Please provide at least one id'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    if len(ids) > MAX_IDS_PER_REQUEST:
+        return Response(
+            {'error': f'At most {MAX_IDS_PER_REQUEST} ids can be requested at once'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+    return Response(get_author_loader(request).load_many(ids))
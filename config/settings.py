@@ -72,8 +72,17 @@ REST_FRAMEWORK = {
      'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticatedOrReadOnly',  # Default: read for all, write for authenticated
     ],
+    'DEFAULT_THROTTLE_RATES': {
+        'user_lookup': os.environ.get('USER_LOOKUP_THROTTLE_RATE', '60/minute'),  # GET /api/users/
+    },
 }
 
+# Trending posts: a comment's contribution to a post's score halves every N hours
+TRENDING_HALF_LIFE_HOURS = float(os.environ.get('TRENDING_HALF_LIFE_HOURS', '24'))
+
+# Query budgets: 'log' warns when a view runs more queries than it declares, 'off' disables counting
+QUERY_BUDGET_MODE = os.environ.get('QUERY_BUDGET_MODE', 'log')
+
 # CORS Configuration
 CORS_ALLOWED_ORIGINS = [
     'https://dashboard-navy-sigma.vercel.app',  # Your Vercel frontend
@@ -99,6 +108,7 @@ CORS_ALLOW_HEADERS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'api.query_budget.QueryBudgetMiddleware',  # Per-view query budgets, see api/query_budget.py
     'whitenoise.middleware.WhiteNoiseMiddleware',  # WhiteNoise for static files
     'django.contrib.sessions.middleware.SessionMiddleware',
     'corsheaders.middleware.CorsMiddleware',  # CORS middleware - should be before CommonMiddleware
@@ -184,6 +194,18 @@ STATIC_ROOT = os.path.join(BASE_DIR, 'staticfiles')
 # WhiteNoise will handle static files in the serverless environment.
 STATICFILES_STORAGE = 'whitenoise.storage.CompressedManifestStaticFilesStorage'
 
+# Uploaded post attachments and their thumbnails
+MEDIA_URL = '/media/'
+MEDIA_ROOT = os.environ.get('MEDIA_ROOT', os.path.join(BASE_DIR, 'media'))
+ATTACHMENT_MAX_BYTES = int(os.environ.get('ATTACHMENT_MAX_BYTES', str(10 * 1024 * 1024)))
+THUMBNAIL_WORKERS = int(os.environ.get('THUMBNAIL_WORKERS', '2'))
+# Attachments need a persistent disk and long-lived processes for thumbnail workers.
+# Vercel functions have a read-only filesystem and freeze after responding, so
+# uploads are refused there unless ATTACHMENTS_ENABLED is set explicitly.
+ATTACHMENTS_ENABLED = os.environ.get('ATTACHMENTS_ENABLED', 'False' if VERCEL_URL else 'True') == 'True'
+# Serve MEDIA_ROOT from Django even with DEBUG off, for hosts without a web server mapping
+SERVE_MEDIA = os.environ.get('SERVE_MEDIA', 'False') == 'True'
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 